@@ -1,8 +1,13 @@
+import logging
 import os
-import secrets
 from typing import Dict, Any, Optional
 from pydantic import BaseSettings, PostgresDsn, validator
 
+logger = logging.getLogger(__name__)
+
+# Fixed fallback so development tokens survive restarts and --reload
+DEVELOPMENT_SECRET_KEY = "your-secret-key-for-development"
+
 
 class Settings(BaseSettings):
     """Application settings and configuration."""
@@ -10,10 +15,22 @@ class Settings(BaseSettings):
     # Application settings
     APP_NAME: str = "Holes For Poles"
     API_V1_STR: str = "/api/v1"
-    SECRET_KEY: str = secrets.token_urlsafe(32)
+    ENVIRONMENT: str = "development"
+    # Must be set outside development; tokens signed with it have to stay
+    # valid across restarts and workers
+    SECRET_KEY: Optional[str] = None
     
-    # 60 minutes * 24 hours * 8 days = 8 days
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    @validator("SECRET_KEY", always=True)
+    def require_secret_key(cls, v: Optional[str], values: Dict[str, Any]) -> str:
+        """Require SECRET_KEY outside development; warn and use a fixed dev key otherwise."""
+        if v:
+            return v
+        if values.get("ENVIRONMENT", "development") != "development":
+            raise ValueError("SECRET_KEY must be set when ENVIRONMENT is not 'development'")
+        logger.warning("SECRET_KEY is not set; using the insecure development key")
+        return DEVELOPMENT_SECRET_KEY
+    
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
     # CORS settings
     ALLOWED_ORIGINS: str = "*"
@@ -21,6 +38,9 @@ class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
     DATABASE_CONNECT_ARGS: Dict[str, Any] = {}
+    DATABASE_POOL_SIZE: int = 20
+    DATABASE_MAX_OVERFLOW: int = 40
+    DATABASE_POOL_RECYCLE: int = 3600
     
     @validator("DATABASE_CONNECT_ARGS")
     def set_connect_args(cls, v: Dict[str, Any], values: Dict[str, Any]) -> Dict[str, Any]:
@@ -33,6 +53,10 @@ class Settings(BaseSettings):
     # JWT related settings
     JWT_ALGORITHM: str = "HS256"
     
+    # Password hashing settings; stored hashes with another cost are
+    # rehashed on the user's next successful login
+    BCRYPT_ROUNDS: int = 12
+    
     class Config:
         """Pydantic config."""
         env_file = ".env"
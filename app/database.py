@@ -1,44 +1,122 @@
-from typing import Generator, Any
+import asyncio
+from asyncio import current_task
+from contextvars import ContextVar
+from typing import Any, Optional
 import os
 
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_scoped_session,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
+# Async drivers used for each configured database backend
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Rewrite a plain database URL to use its asyncio driver."""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+# Create SQLAlchemy engine; the pool class is explicit because aiosqlite
+# would otherwise default to NullPool and ignore the pool settings
+engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    poolclass=AsyncAdaptedQueuePool,
     pool_pre_ping=True,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    pool_recycle=settings.DATABASE_POOL_RECYCLE,
     connect_args=settings.DATABASE_CONNECT_ARGS
 )
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Connection settings applied to every SQLite connection: WAL lets readers
+# run alongside a writer, and NORMAL sync skips the fsync on each commit
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        """Apply SQLITE_PRAGMAS to a new SQLite connection."""
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+# Identifies the current HTTP request; set by the session middleware in main.py
+request_scope: ContextVar[Optional[object]] = ContextVar("request_scope", default=None)
+
+
+def _session_scope() -> Any:
+    """Scope sessions per request, falling back to the current task outside requests."""
+    scope = request_scope.get()
+    return scope if scope is not None else current_task()
+
+
+# Create request-scoped SessionLocal registry
+SessionLocal = async_scoped_session(
+    async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    ),
+    scopefunc=_session_scope,
+)
 
 # Create Base class for models
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncSession:
     """
     Dependency to get DB session.
     
-    Yields:
-        Session: SQLAlchemy database session
+    The session is shared for the whole request and released by the
+    session middleware via SessionLocal.remove().
+    
+    Returns:
+        AsyncSession: SQLAlchemy database session
     """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    return SessionLocal()
 
 
-def init_db() -> None:
+async def init_db() -> None:
     """Initialize database by creating all tables."""
     # Import all models here to ensure they are registered with Base
     from app.models import User
     
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def create_tables() -> None:
+    """
+    Create all tables from a synchronous entry point.
+    
+    Run once per deploy (see render.yaml) rather than on every worker start:
+        python -c "from app.database import create_tables; create_tables()"
+    """
+    async def _create_tables() -> None:
+        await init_db()
+        await engine.dispose()
+    
+    asyncio.run(_create_tables())
 
@@ -1,8 +1,11 @@
 from typing import Any, Dict
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas, security
 from app.database import get_db
@@ -17,24 +20,28 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 # Dependencies
 async def get_current_user(
     token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
-) -> models.User:
+    db: AsyncSession = Depends(get_db)
+) -> security.CachedUser:
     """
     Get current user from token.
     
+    Users are served from security.user_cache when possible, so changes to
+    a user (e.g. deactivation) can take up to USER_CACHE_TTL seconds to
+    apply to tokens already in use.
+    
     Args:
         token: JWT token
         db: Database session
         
     Returns:
-        User model if authenticated
+        Cached user snapshot if authenticated
         
     Raises:
         HTTPException: If authentication fails
     """
     try:
         token_data = security.decode_access_token(token)
-        user_id = token_data.sub
+        user_id = int(token_data.sub)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,13 +49,17 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = security.user_cache.get(str(user_id))
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        result = await db.execute(select(models.User).where(models.User.id == user_id))
+        db_user = result.scalars().first()
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user = security.cache_user(db_user)
     
     if not user.is_active:
         raise HTTPException(
@@ -61,14 +72,21 @@ async def get_current_user(
 
 
 # Routes
-@router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_201_CREATED: {"model": schemas.User}},
+)
 async def register(
     user_data: schemas.UserCreate, 
-    db: Session = Depends(get_db)
-) -> Any:
+    db: AsyncSession = Depends(get_db)
+) -> ORJSONResponse:
     """
     Register a new user.
     
+    The response is built directly from the new row instead of going
+    through response_model validation; it matches the schemas.User shape.
+    
     Args:
         user_data: User registration data
         db: Database session
@@ -79,24 +97,9 @@ async def register(
     Raises:
         HTTPException: If user with email or username already exists
     """
-    # Check if user with email already exists
-    user_by_email = db.query(models.User).filter(models.User.email == user_data.email).first()
-    if user_by_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
-        )
-    
-    # Check if user with username already exists
-    user_by_username = db.query(models.User).filter(models.User.username == user_data.username).first()
-    if user_by_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken",
-        )
-    
-    # Create new user
-    hashed_password = security.get_password_hash(user_data.password)
+    # Create new user; the unique constraints on email and username
+    # reject duplicates, so the happy path needs no pre-check queries
+    hashed_password = await security.aget_password_hash(user_data.password)
     user = models.User(
         email=user_data.email,
         username=user_data.username,
@@ -105,16 +108,49 @@ async def register(
     )
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        result = await db.execute(
+            select(models.User.email, models.User.username).where(
+                or_(models.User.email == user_data.email, models.User.username == user_data.username)
+            )
+        )
+        existing = result.all()
+        if any(row.email == user_data.email for row in existing):
+            detail = "Email already registered"
+        elif any(row.username == user_data.username for row in existing):
+            detail = "Username already taken"
+        else:
+            # Not a duplicate we can identify (another constraint, or the
+            # conflicting row is already gone), so don't guess
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+        )
     
-    return user
+    # No refresh needed: the INSERT sets the id, every other column has a
+    # Python-side default, and expire_on_commit=False keeps them loaded
+    return ORJSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "email": user.email,
+            "username": user.username,
+            "full_name": user.full_name,
+            "is_active": user.is_active,
+            "id": user.id,
+            "created_at": user.created_at,
+            "updated_at": user.updated_at,
+        },
+    )
 
 
 @router.post("/login", response_model=schemas.Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Dict[str, str]:
     """
     Log in and get access token.
@@ -129,15 +165,20 @@ async def login(
     Raises:
         HTTPException: If authentication fails
     """
+    # Only the columns needed to authenticate are fetched
+    login_columns = select(models.User.id, models.User.hashed_password, models.User.is_active)
+    
     # Try to find user by username
-    user = db.query(models.User).filter(models.User.username == form_data.username).first()
+    result = await db.execute(login_columns.where(models.User.username == form_data.username))
+    user = result.first()
     
     # If not found, try with email
     if not user:
-        user = db.query(models.User).filter(models.User.email == form_data.username).first()
+        result = await db.execute(login_columns.where(models.User.email == form_data.username))
+        user = result.first()
     
     # If still not found or password doesn't match, raise error
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    if not user or not await security.averify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -152,6 +193,16 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Migrate the stored hash if BCRYPT_ROUNDS has changed since it was made
+    if security.password_needs_rehash(user.hashed_password):
+        hashed_password = await security.aget_password_hash(form_data.password)
+        await db.execute(
+            update(models.User)
+            .where(models.User.id == user.id)
+            .values(hashed_password=hashed_password)
+        )
+        await db.commit()
+    
     # Create access token
     access_token = security.create_access_token(subject=user.id)
     
@@ -163,7 +214,7 @@ async def login(
 
 @router.get("/me", response_model=schemas.User)
 async def get_current_user_info(
-    current_user: models.User = Depends(get_current_user)
+    current_user: security.CachedUser = Depends(get_current_user)
 ) -> Any:
     """
     Get current user information.
@@ -179,7 +230,7 @@ async def get_current_user_info(
 
 @router.post("/refresh", response_model=schemas.Token)
 async def refresh_token(
-    current_user: models.User = Depends(get_current_user)
+    current_user: security.CachedUser = Depends(get_current_user)
 ) -> Dict[str, str]:
     """
     Refresh access token.
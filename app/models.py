@@ -1,23 +1,36 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Boolean, Column, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Index, event
 from sqlalchemy.orm import relationship
-from passlib.context import CryptContext
 
+from app import security
 from app.database import Base
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 class User(Base):
     """SQLAlchemy User model for authentication."""
     
     __tablename__ = "users"
+    __table_args__ = (
+        # Unique indexes that also cover login lookups on PostgreSQL, so
+        # they can be answered from the index alone
+        Index(
+            "ix_users_username",
+            "username",
+            unique=True,
+            postgresql_include=["id", "hashed_password", "is_active"],
+        ),
+        Index(
+            "ix_users_email",
+            "email",
+            unique=True,
+            postgresql_include=["id", "hashed_password", "is_active"],
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    username = Column(String, unique=True, index=True)
-    email = Column(String, unique=True, index=True)
+    username = Column(String)
+    email = Column(String)
     hashed_password = Column(String)
     full_name = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
@@ -27,10 +40,17 @@ class User(Base):
     
     def verify_password(self, plain_password: str) -> bool:
         """Verify password against stored hash."""
-        return pwd_context.verify(plain_password, self.hashed_password)
+        return security.verify_password(plain_password, self.hashed_password)
     
     @staticmethod
     def get_password_hash(password: str) -> str:
         """Generate password hash from plain text password."""
-        return pwd_context.hash(password)
+        return security.get_password_hash(password)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_cache(mapper, connection, target: User) -> None:
+    """Evict changed users so is_active and profile edits take effect."""
+    security.invalidate_cached_user(target.id)
 
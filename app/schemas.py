@@ -1,10 +1,56 @@
-from typing import Optional, List, Union
-from pydantic import BaseModel, EmailStr, Field, validator
+import re
+from typing import Annotated, Optional, List, Union
+from email_validator import SPECIAL_USE_DOMAIN_NAMES
+from email_validator.rfc_constants import CASE_INSENSITIVE_MAILBOX_NAMES
+from pydantic import AfterValidator, BaseModel, Field, WithJsonSchema, validator
+from pydantic.networks import validate_email
 from datetime import datetime
 
+# Matches passwords with at least one digit and one uppercase ASCII letter
+_PASSWORD_RE = re.compile(r"^(?=.*\d)(?=.*[A-Z]).+$", re.DOTALL)
+
+# Matches plain ASCII addresses that email_validator would accept unchanged
+# apart from lowercasing the domain. Must be used with fullmatch.
+_EMAIL_RE = re.compile(
+    r"(?=[^@]{1,64}@)[A-Za-z0-9_%+-]+(?:\.[A-Za-z0-9_%+-]+)*"
+    r"@(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63}"
+)
+
+
+def _is_fast_email(v: str) -> bool:
+    """Check whether email_validator would only lowercase the domain of v."""
+    if len(v) > 254 or not _EMAIL_RE.fullmatch(v):
+        return False
+    local, _, domain = v.rpartition("@")
+    domain = domain.lower()
+    # "--" labels (including IDNA "xn--" labels) need IDNA checks/decoding
+    if "--" in domain:
+        return False
+    # email_validator lowercases these mailbox names
+    if local.lower() in CASE_INSENSITIVE_MAILBOX_NAMES:
+        return False
+    return not any(domain == d or domain.endswith("." + d) for d in SPECIAL_USE_DOMAIN_NAMES)
+
+
+def _validate_fast_email(v: str) -> str:
+    """Validate an email like EmailStr, skipping email_validator for common ASCII addresses."""
+    if _is_fast_email(v):
+        local, _, domain = v.rpartition("@")
+        return f"{local}@{domain.lower()}"
+    return validate_email(v)[1]
+
+
+# Drop-in replacement for EmailStr with a regex fast path; the JSON schema
+# keeps EmailStr's "email" format for /docs and generated clients
+FastEmail = Annotated[
+    str,
+    AfterValidator(_validate_fast_email),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
+
 
 class UserBase(BaseModel):
-    email: EmailStr
+    email: FastEmail
     username: str = Field(..., min_length=3, max_length=50)
     full_name: Optional[str] = None
     is_active: bool = True
@@ -15,6 +61,9 @@ class UserCreate(UserBase):
     
     @validator('password')
     def password_strength(cls, v):
+        if _PASSWORD_RE.match(v):
+            return v
+        # Slow path: find which rule failed (and accept non-ASCII uppercase)
         if not any(char.isdigit() for char in v):
             raise ValueError('Password must contain at least one digit')
         if not any(char.isupper() for char in v):
@@ -23,7 +72,7 @@ class UserCreate(UserBase):
 
 
 class UserUpdate(BaseModel):
-    email: Optional[EmailStr] = None
+    email: Optional[FastEmail] = None
     full_name: Optional[str] = None
     password: Optional[str] = None
 
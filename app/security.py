@@ -1,32 +1,96 @@
+import functools
 import os
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Union
+from types import SimpleNamespace
+from typing import Any, Dict, NamedTuple, Optional, Union
 
-from jose import jwt
-from passlib.context import CryptContext
-from pydantic import ValidationError
+import anyio
+import bcrypt
+import jwt
+from cachetools import TLRUCache, TTLCache
 
-from app.schemas import TokenPayload
+from app.config import settings
 
 
-# Configuration
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-for-development")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# JWT helpers bound once to the configured key and algorithm
+_encode_jwt = functools.partial(jwt.encode, key=settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+_decode_jwt = functools.partial(jwt.decode, key=settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
 
+# Limits concurrent bcrypt calls to one per core; created on first use
+# because anyio limiters must be built inside a running event loop.
+_bcrypt_limiter: Optional[anyio.CapacityLimiter] = None
 
-# Security utilities
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Cache of decoded tokens, keyed by the raw token string
+JWT_CACHE_TTL = 60
+JWT_CACHE_MAXSIZE = 10_000
+
+# Cache of authenticated users, keyed by str(user id). The TTL bounds how
+# long a deactivated user can keep using an unexpired token.
+USER_CACHE_TTL = 30
+USER_CACHE_MAXSIZE = 10_000
+
+
+class CachedUser(NamedTuple):
+    """Detached snapshot of a User row used by authenticated requests."""
+    id: int
+    email: str
+    username: str
+    full_name: Optional[str]
+    is_active: bool
+    is_superuser: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+user_cache: TTLCache = TTLCache(maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL)
 
 
+# Security utilities
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against a bcrypt ($2b$) hash."""
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
 
 def get_password_hash(password: str) -> str:
-    """Generate password hash."""
-    return pwd_context.hash(password)
+    """Generate a bcrypt ($2b$) password hash."""
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode()
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a hash was made with another scheme or cost than BCRYPT_ROUNDS."""
+    try:
+        ident, rounds = hashed_password.split("$")[1:3]
+        return ident != "2b" or int(rounds) != settings.BCRYPT_ROUNDS
+    except ValueError:
+        return True
+
+
+def _get_bcrypt_limiter() -> anyio.CapacityLimiter:
+    """Return the shared limiter for bcrypt worker threads."""
+    global _bcrypt_limiter
+    if _bcrypt_limiter is None:
+        _bcrypt_limiter = anyio.CapacityLimiter(os.cpu_count() or 1)
+    return _bcrypt_limiter
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread without blocking the event loop."""
+    return await anyio.to_thread.run_sync(
+        verify_password, plain_password, hashed_password, limiter=_get_bcrypt_limiter()
+    )
+
+
+async def aget_password_hash(password: str) -> str:
+    """Generate a password hash in a worker thread without blocking the event loop."""
+    return await anyio.to_thread.run_sync(
+        get_password_hash, password, limiter=_get_bcrypt_limiter()
+    )
+
+
+async def warm_up_password_hashing() -> None:
+    """Hash once at startup so the first login doesn't pay for bcrypt and thread pool setup."""
+    await aget_password_hash("warmup")
 
 
 def create_access_token(
@@ -48,7 +112,7 @@ def create_access_token(
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {
         "sub": str(subject),
@@ -56,40 +120,103 @@ def create_access_token(
         "scopes": scopes
     }
     
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _encode_jwt(to_encode)
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[TokenPayload]:
+def _decode_payload(token: str) -> Dict[str, Any]:
     """
-    Decode and validate JWT access token.
+    Verify a JWT signature and expiry and return its raw claims.
     
     Args:
         token: JWT token
         
     Returns:
-        TokenPayload if valid, None if invalid
+        Decoded claims dictionary
         
     Raises:
         ValueError: If token validation fails
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        token_data = TokenPayload(**payload)
+        payload = _decode_jwt(token)
+    except jwt.PyJWTError as e:
+        raise ValueError(f"Invalid token: {str(e)}")
+    
+    exp = payload.get("exp")
+    if not isinstance(exp, int) or "sub" not in payload:
+        raise ValueError("Invalid token: missing claims")
+    if exp < int(time.time()):
+        raise ValueError("Token expired")
+    
+    return payload
+
+
+def _token_ttu(token: str, token_data: SimpleNamespace, now: float) -> float:
+    """Expire cached tokens after JWT_CACHE_TTL or at their own exp, whichever is first."""
+    return min(now + JWT_CACHE_TTL, token_data.exp)
+
+
+_jwt_cache: TLRUCache = TLRUCache(maxsize=JWT_CACHE_MAXSIZE, ttu=_token_ttu, timer=time.time)
+
+
+def decode_access_token(token: str) -> Optional[SimpleNamespace]:
+    """
+    Decode and validate JWT access token.
+    
+    Successfully decoded tokens are cached until they expire (at most
+    JWT_CACHE_TTL seconds), so repeat requests skip the HMAC check. The
+    claims are already checked by _decode_payload, so they are returned
+    as a plain namespace with the same fields as schemas.TokenPayload.
+    
+    Args:
+        token: JWT token
+        
+    Returns:
+        Namespace with sub, exp and scopes if valid
         
-        if datetime.fromtimestamp(token_data.exp) < datetime.utcnow():
-            raise ValueError("Token expired")
-            
+    Raises:
+        ValueError: If token validation fails
+    """
+    token_data = _jwt_cache.get(token)
+    if token_data is not None:
         return token_data
-    except (jwt.JWTError, ValidationError) as e:
-        raise ValueError(f"Invalid token: {str(e)}")
+    
+    payload = _decode_payload(token)
+    token_data = SimpleNamespace(
+        sub=payload["sub"],
+        exp=payload["exp"],
+        scopes=payload.get("scopes", []),
+    )
+    
+    _jwt_cache[token] = token_data
+    return token_data
 
 
 def get_user_id_from_token(token: str) -> Optional[Union[str, int]]:
     """Extract user ID from token."""
     try:
-        token_data = decode_access_token(token)
-        return token_data.sub
+        return _decode_payload(token)["sub"]
     except ValueError:
         return None
 
+
+def cache_user(user: Any) -> CachedUser:
+    """Store a detached snapshot of a User in the user cache and return it."""
+    cached = CachedUser(
+        id=user.id,
+        email=user.email,
+        username=user.username,
+        full_name=user.full_name,
+        is_active=user.is_active,
+        is_superuser=user.is_superuser,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+    )
+    user_cache[str(user.id)] = cached
+    return cached
+
+
+def invalidate_cached_user(user_id: Union[str, int]) -> None:
+    """Drop a user from the user cache after their row changes."""
+    user_cache.pop(str(user_id), None)
+
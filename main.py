@@ -1,18 +1,26 @@
+import asyncio
+import atexit
+import contextlib
 import logging
+import logging.handlers
 import os
+import queue
 import socket
 import platform
+import time
 from datetime import datetime
 from typing import Dict, Any
 
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from dotenv import load_dotenv
+from sqlalchemy import text
 
-from app.database import Base, engine, SessionLocal
+from app.database import SessionLocal, create_tables, engine, request_scope
 from app.endpoints.auth import router as auth_router
+from app import security
 from app.config import settings
 
 # Load environment variables from .env file
@@ -23,15 +31,27 @@ PORT = int(os.getenv("PORT", 8000))
 ENV = os.getenv("ENVIRONMENT", "development")
 DEBUG = os.getenv("DEBUG", "False").lower() == "true" if not hasattr(settings, "DEBUG") else settings.DEBUG
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("app.log"),
-    ],
-)
+# Configure logging; records are queued and written by a background
+# listener thread so request handlers never block on log I/O. This runs
+# once per process: `python main.py` imports this module a second time
+# via uvicorn, and that import reuses the queue handler set up here.
+if not any(isinstance(h, logging.handlers.QueueHandler) for h in logging.getLogger().handlers):
+    log_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    log_handlers = [logging.StreamHandler(), logging.FileHandler("app.log", delay=True)]
+    for handler in log_handlers:
+        handler.setFormatter(log_formatter)
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    log_listener = logging.handlers.QueueListener(log_queue, *log_handlers)
+    log_listener.start()
+    # Flush queued records when the process exits
+    atexit.register(log_listener.stop)
+    
+    # The queue handler only renders the message; the listener's handlers
+    # apply log_formatter, so each line is prefixed exactly once
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app with metadata
@@ -41,40 +61,113 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     debug=DEBUG
 )
 
-# Add CORS middleware
+# Allowed CORS origins, parsed once; origins compare case-insensitively
+CORS_ORIGINS = frozenset(
+    origin.strip().lower()
+    for origin in (settings.CORS_ORIGINS if hasattr(settings, "CORS_ORIGINS") else os.getenv("CORS_ORIGINS", "*").split(","))
+    if origin.strip()
+)
+
+# Add CORS middleware; only the methods and headers the API uses are allowed
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS if hasattr(settings, "CORS_ORIGINS") else os.getenv("CORS_ORIGINS", "*").split(","),
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
-# Initialize database tables
-Base.metadata.create_all(bind=engine)
+# Bind one database session to each request and release it afterwards
+@app.middleware("http")
+async def db_session_middleware(request: Request, call_next):
+    token = request_scope.set(object())
+    try:
+        return await call_next(request)
+    finally:
+        await SessionLocal.remove()
+        request_scope.reset(token)
 
 # Include routers
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 
+# Host details reported by /health; they don't change while the process runs
+_hostname = socket.gethostname()
+try:
+    _ip_address = socket.gethostbyname(_hostname)
+except OSError:
+    _ip_address = None
+
+_STATIC_HEALTH: Dict[str, Any] = {
+    "version": app.version,
+    "environment": ENV,
+    "hostname": _hostname,
+    "ip_address": _ip_address,
+    "python_version": platform.python_version(),
+    "system_info": {
+        "os": platform.system(),
+        "os_version": platform.version(),
+        "machine": platform.machine(),
+    },
+}
+
+# Database probe results served by /health, refreshed in the background
+HEALTH_REFRESH_SECONDS = 2.0
+HEALTH_MAX_AGE_SECONDS = 5.0
+_health_cache: Dict[str, Any] = {"at": 0.0, "database": None}
+
+
+async def refresh_health_cache() -> str:
+    """Probe the database connection and store the result in the health cache."""
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        db_status = "connected"
+    except Exception as e:
+        logger.error(f"Health check failed: {str(e)}")
+        db_status = "disconnected"
+    
+    _health_cache["at"] = time.monotonic()
+    _health_cache["database"] = db_status
+    return db_status
+
+
+async def _health_cache_loop() -> None:
+    """Keep the health cache fresh so /health never waits on the database."""
+    while True:
+        await refresh_health_cache()
+        await asyncio.sleep(HEALTH_REFRESH_SECONDS)
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     logger.info(f"Starting application in {ENV} environment")
     logger.info(f"Debug mode: {DEBUG}")
     
+    # Warm up password hashing before the first login arrives
+    await security.warm_up_password_hashing()
+    
+    # Start refreshing the cached health probe
+    app.state.health_task = asyncio.create_task(_health_cache_loop())
+    
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Application shutdown")
+    # Let a running probe finish unwinding before the pool is disposed
+    app.state.health_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await app.state.health_task
+    await engine.dispose()
 
 # Error handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     logger.error(f"Validation error: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={"detail": exc.errors()},
     )
@@ -82,7 +175,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     logger.warning(f"HTTP exception {exc.status_code}: {exc.detail}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
     )
@@ -90,7 +183,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unexpected error: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "Internal server error", "error": str(exc) if DEBUG else ""},
     )
@@ -118,41 +211,25 @@ async def health_check() -> Dict[str, Any]:
     """
     logger.debug("Health check endpoint accessed")
     
-    # Gather system information
-    hostname = socket.gethostname()
-    ip_address = socket.gethostbyname(hostname)
-    
-    try:
-        # Create a database session to test database connection
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
-        db_status = "connected"
-        status = "healthy"
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        db_status = "disconnected"
-        status = "unhealthy"
+    # Use the cached database probe unless it has gone stale
+    db_status = _health_cache["database"]
+    if db_status is None or time.monotonic() - _health_cache["at"] > HEALTH_MAX_AGE_SECONDS:
+        db_status = await refresh_health_cache()
+    status = "healthy" if db_status == "connected" else "unhealthy"
     
     return {
         "status": status,
         "database": db_status,
         "timestamp": datetime.now().isoformat(),
-        "version": app.version,
-        "environment": ENV,
-        "hostname": hostname,
-        "ip_address": ip_address,
-        "python_version": platform.python_version(),
-        "system_info": {
-            "os": platform.system(),
-            "os_version": platform.version(),
-            "machine": platform.machine(),
-        }
+        **_STATIC_HEALTH,
     }
 
 # Run the application when executed directly
 if __name__ == "__main__":
     import uvicorn
+    # Tables are created here for local runs; deployments create them
+    # once before starting the workers
+    create_tables()
     logger.info(f"Starting server on port {PORT}")
     uvicorn.run(
         "main:app", 